@@ -5,8 +5,6 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-import uvicorn
-from src.api import create_app
 from src.utils import setup_logger
 
 logger = setup_logger()
@@ -21,6 +19,8 @@ def main():
         logger.error(f"Config file not found: {config_path}")
         sys.exit(1)
     
+    from src.api import create_app
+    
     app = create_app(config_path)
     
     host = os.getenv("HOST", "0.0.0.0")
@@ -28,12 +28,16 @@ def main():
     
     logger.info(f"Server starting at {host}:{port}")
     
+    import uvicorn
+    
     uvicorn.run(
         app,
         host=host,
         port=port,
         log_level="info",
-        access_log=True
+        access_log=os.getenv("ACCESS_LOG", "false").lower() == "true",
+        loop=os.getenv("UVICORN_LOOP", "auto"),
+        http=os.getenv("UVICORN_HTTP", "auto")
     )
 
 
@@ -5,7 +5,6 @@ Streamlit 대시보드를 시작하는 메인 실행 파일
 """
 
 import sys
-import subprocess
 import os
 from pathlib import Path
 
@@ -35,15 +34,11 @@ def main():
         print(f"🚀 Starting SignalRouter Dashboard at http://{dashboard_host}:{dashboard_port}")
         print(f"📊 Dashboard URL: http://localhost:{dashboard_port}")
         print("Press Ctrl+C to stop the dashboard")
+        sys.stdout.flush()
         
-        # Streamlit 실행
-        subprocess.run(cmd, check=True)
+        # Streamlit 실행 (현재 프로세스를 교체하므로 런처 인터프리터가 남지 않음)
+        os.execvp(cmd[0], cmd)
         
-    except KeyboardInterrupt:
-        print("\n🛑 Dashboard stopped by user")
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Failed to start dashboard: {e}")
-        sys.exit(1)
     except FileNotFoundError:
         print("❌ Streamlit not found. Please install with: pip install streamlit")
         sys.exit(1)
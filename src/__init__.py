@@ -1,10 +1,15 @@
 __version__ = "2.0.0"
 __author__ = "Cho Sangjun"
 
-from .models.signal import Signal, ExecutionResult
-from .core.executor import SignalExecutor
-from .broker.kis_api import KisBroker
-from .config.loader import ConfigLoader
+from importlib import import_module
+
+_EXPORTS = {
+    'Signal': '.models.signal',
+    'ExecutionResult': '.models.signal',
+    'SignalExecutor': '.core.executor',
+    'KisBroker': '.broker.kis_api',
+    'ConfigLoader': '.config.loader'
+}
 
 __all__ = [
     'Signal',
@@ -12,4 +17,14 @@ __all__ = [
     'SignalExecutor',
     'KisBroker',
     'ConfigLoader'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name: str):
+    module_path = _EXPORTS.get(name)
+    if module_path is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(import_module(module_path, __name__), name)
+    globals()[name] = value
+    return value
\ No newline at end of file
@@ -0,0 +1,10 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from ..utils.json_codec import dumps
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
\ No newline at end of file
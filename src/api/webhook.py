@@ -1,3 +1,7 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Set, Tuple
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 import logging
@@ -5,93 +9,180 @@ from datetime import datetime
 
 from ..core.executor import SignalExecutor
 from ..models.signal import Signal
+from ..utils.json_codec import loads
+from .responses import ORJSONResponse
 
 logger = logging.getLogger(__name__)
 
+_SIGNAL_REQUIRED = frozenset(('symbol', 'action', 'quantity', 'webhook_token'))
+
 
 def create_app(config_path: str = "config/config.yaml") -> FastAPI:
     app = FastAPI(
         title="Signal Executor",
         description="Simple webhook receiver for TradingView signals",
-        version="2.0.0"
-    )
-    
-    app.add_middleware(
-        CORSMiddleware,
-        allow_origins=["*"],
-        allow_credentials=True,
-        allow_methods=["*"],
-        allow_headers=["*"],
+        version="2.0.0",
+        default_response_class=ORJSONResponse
     )
     
     executor = SignalExecutor(config_path)
     app.state.executor = executor
     
+    cors_origins = executor.config.get('webhook.cors_origins')
+    if cors_origins:
+        app.add_middleware(
+            CORSMiddleware,
+            allow_origins=cors_origins,
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+        )
+    
+    executor_pool = ThreadPoolExecutor(
+        max_workers=executor.config.get('webhook.worker_threads', 32),
+        thread_name_prefix="signal"
+    )
+    app.state.executor_pool = executor_pool
+    
+    dedupe_window = executor.config.get('webhook.dedupe_window', 60)
+    recent_signals: Dict[Tuple[str, str], Tuple[float, int, dict]] = {}
+    pending_signals: Set[Tuple[str, str]] = set()
+    
+    def parse_signal(payload) -> Signal:
+        if not isinstance(payload, dict) or not _SIGNAL_REQUIRED <= payload.keys():
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "status": "error",
+                    "message": "Missing required fields: symbol, action, quantity, webhook_token",
+                    "timestamp": datetime.now().isoformat()
+                }
+            )
+        
+        signal = Signal.from_webhook(payload)
+        valid, error = signal.validate()
+        if not valid:
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "status": "error",
+                    "message": f"Invalid signal: {error}",
+                    "timestamp": datetime.now().isoformat()
+                }
+            )
+        
+        return signal
+    
+    async def execute_signal(signal: Signal) -> Tuple[Optional[str], int, dict]:
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(executor_pool, executor.execute, signal)
+        timestamp = datetime.now().isoformat()
+        
+        if result.success:
+            return result.order_id, 200, {
+                "status": "ok",
+                "order_id": result.order_id,
+                "filled": result.filled,
+                "timestamp": timestamp
+            }
+        
+        return result.order_id, 400, {
+            "detail": {
+                "status": "error",
+                "message": result.error,
+                "order_id": result.order_id,
+                "timestamp": timestamp
+            }
+        }
+    
     @app.post("/webhook")
     async def receive_signal(request: Request):
         try:
-            payload = await request.json()
-            logger.info(f"Webhook received: {payload}")
+            payload = loads(await request.body())
+            logger.info("Webhook received: %s", payload)
             
-            signal = Signal.from_webhook(payload)
-            result = executor.execute(signal)
+            signal = parse_signal(payload)
+            signal_id = payload.get('signal_id')
             
-            if result.success:
-                return {
-                    "status": "ok",
-                    "order_id": result.order_id,
-                    "filled": result.filled,
-                    "timestamp": datetime.now().isoformat()
-                }
-            else:
+            if not dedupe_window or not signal_id:
+                _, status_code, content = await execute_signal(signal)
+                return ORJSONResponse(content, status_code=status_code)
+            
+            key = (signal.webhook_token, str(signal_id))
+            
+            cached = recent_signals.get(key)
+            if cached and cached[0] > time.monotonic():
+                logger.info("Duplicate webhook replayed: %s", signal_id)
+                return ORJSONResponse(cached[2], status_code=cached[1])
+            
+            if key in pending_signals:
+                logger.info("Duplicate webhook rejected, still in progress: %s", signal_id)
                 raise HTTPException(
-                    status_code=400,
+                    status_code=409,
                     detail={
                         "status": "error",
-                        "message": result.error,
-                        "order_id": result.order_id,
+                        "message": "Duplicate signal in progress",
                         "timestamp": datetime.now().isoformat()
                     }
                 )
+            
+            pending_signals.add(key)
+            try:
+                order_id, status_code, content = await execute_signal(signal)
+            finally:
+                pending_signals.discard(key)
+            
+            if order_id:
+                now = time.monotonic()
+                for expired in [k for k, entry in recent_signals.items() if entry[0] <= now]:
+                    del recent_signals[expired]
+                recent_signals[key] = (now + dedupe_window, status_code, content)
+            
+            return ORJSONResponse(content, status_code=status_code)
         
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Webhook error: {e}")
+            logger.error("Webhook error: %s", e)
             raise HTTPException(status_code=500, detail=str(e))
     
     @app.get("/health")
     async def health_check():
         status = executor.get_status()
-        return {
+        return ORJSONResponse({
             "status": "healthy" if not status['emergency_stop'] else "stopped",
             "timestamp": datetime.now().isoformat(),
             **status
-        }
+        })
     
     @app.post("/emergency-stop")
     async def emergency_stop():
         executor.emergency_stop()
-        return {
+        return ORJSONResponse({
             "status": "stopped",
             "message": "Emergency stop activated",
             "timestamp": datetime.now().isoformat()
-        }
+        })
     
     @app.post("/resume")
     async def resume_trading():
         executor.resume()
-        return {
+        return ORJSONResponse({
             "status": "resumed",
             "message": "Trading resumed",
             "timestamp": datetime.now().isoformat()
-        }
+        })
     
     @app.on_event("startup")
     async def startup_event():
         logger.info("Signal Executor API started")
+        if executor.config.get('webhook.warmup', True):
+            asyncio.get_running_loop().run_in_executor(executor_pool, executor.warmup)
     
     @app.on_event("shutdown")
     async def shutdown_event():
         logger.info("Signal Executor API shutting down")
+        await asyncio.get_running_loop().run_in_executor(None, executor_pool.shutdown)
     
     return app
 
@@ -105,5 +196,12 @@ if __name__ == "__main__":
     host = os.getenv("HOST", "0.0.0.0")
     port = int(os.getenv("PORT", 8000))
     
-    logger.info(f"Starting server at {host}:{port}")
-    uvicorn.run(app, host=host, port=port, log_level="info")
\ No newline at end of file
+    logger.info("Starting server at %s:%s", host, port)
+    uvicorn.run(
+        app,
+        host=host,
+        port=port,
+        log_level="info",
+        loop=os.getenv("UVICORN_LOOP", "auto"),
+        http=os.getenv("UVICORN_HTTP", "auto")
+    )
\ No newline at end of file
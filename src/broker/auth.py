@@ -1,17 +1,23 @@
 import os
-import json
-import yaml
 import time
-import requests
-from datetime import datetime, timedelta
+import threading
+from datetime import datetime
 from pathlib import Path
 from typing import Dict, Optional, Tuple
 import logging
 
+from .session import kis_session
+from ..utils.json_codec import loads, dumps
+
 logger = logging.getLogger(__name__)
 
+_TOKEN_CACHE: Dict[Tuple[str, str], Tuple[str, float]] = {}
+_TOKEN_LOCKS: Dict[Tuple[str, str], threading.Lock] = {}
+
 
 class KisAuth:
+    TOKEN_EXPIRY_MARGIN = 60
+    
     def __init__(self, app_key: str, app_secret: str, account_number: str,
                  account_product: str, is_virtual: bool = False,
                  token_storage_path: str = "secrets/tokens/"):
@@ -27,63 +33,92 @@ class KisAuth:
         else:
             self.base_url = "https://openapi.koreainvestment.com:9443"
         
+        self._cache_key = (self.base_url, app_key)
+        self._token_url = f"{self.base_url}/oauth2/tokenP"
+        self._token_body = dumps({
+            "grant_type": "client_credentials",
+            "appkey": app_key,
+            "appsecret": app_secret
+        })
+        self._token_headers = {
+            "Content-Type": "application/json",
+            "Accept": "text/plain",
+            "charset": "UTF-8"
+        }
+        
+        self._tr_prefix_map = {'T': 'V', 'J': 'V', 'C': 'V'} if is_virtual else {}
+        self._base_headers = {
+            "Content-Type": "application/json",
+            "Accept": "text/plain",
+            "charset": "UTF-8",
+            "appkey": app_key,
+            "appsecret": app_secret,
+            "custtype": "P"
+        }
+        self._authorization = (None, "")
+        
         self.token_storage_path.mkdir(parents=True, exist_ok=True)
+        self._token_file = self.token_storage_path / f"kis_{self.account_number}.json"
+        self._token_tmp_file = self._token_file.with_suffix('.json.tmp')
+        self._remove_legacy_tokens()
         
-        logger.info(f"KisAuth initialized - Virtual: {is_virtual}")
+        logger.info("KisAuth initialized - Virtual: %s", is_virtual)
     
     def get_valid_token(self) -> str:
-        try:
-            saved_token = self._load_saved_token()
-            if saved_token and self._is_token_valid(saved_token):
-                return saved_token
+        cached = _TOKEN_CACHE.get(self._cache_key)
+        if cached and self._is_token_valid_by_time(cached[1]):
+            return cached[0]
+        
+        with _TOKEN_LOCKS.setdefault(self._cache_key, threading.Lock()):
+            cached = _TOKEN_CACHE.get(self._cache_key)
+            if cached and self._is_token_valid_by_time(cached[1]):
+                return cached[0]
             
-            token, expired_time = self._request_new_token()
-            self._save_token(token, expired_time)
-            return token
-        
-        except Exception as e:
-            logger.error(f"Failed to get valid token: {e}")
-            raise
+            try:
+                saved = self._load_saved_token()
+                if saved and self._is_token_valid(saved[0]):
+                    _TOKEN_CACHE[self._cache_key] = saved
+                    return saved[0]
+                
+                token, expired_time = self._request_new_token()
+                self._save_token(token, expired_time)
+                _TOKEN_CACHE[self._cache_key] = (token, self._parse_expired_time(expired_time))
+                return token
+            
+            except Exception as e:
+                logger.error("Failed to get valid token: %s", e)
+                raise
     
     def get_request_headers(self, tr_id: str, tr_cont: str = "") -> Dict[str, str]:
         token = self.get_valid_token()
         
-        if self.is_virtual and tr_id.startswith(('T', 'J', 'C')):
-            tr_id = 'V' + tr_id[1:]
+        if self._tr_prefix_map:
+            prefix = tr_id[:1]
+            tr_id = self._tr_prefix_map.get(prefix, prefix) + tr_id[1:]
         
-        return {
-            "Content-Type": "application/json",
-            "Accept": "text/plain",
-            "charset": "UTF-8",
-            "authorization": f"Bearer {token}",
-            "appkey": self.app_key,
-            "appsecret": self.app_secret,
-            "tr_id": tr_id,
-            "custtype": "P",
-            "tr_cont": tr_cont
-        }
+        cached_token, authorization = self._authorization
+        if token != cached_token:
+            authorization = f"Bearer {token}"
+            self._authorization = (token, authorization)
+        
+        headers = self._base_headers.copy()
+        headers["authorization"] = authorization
+        headers["tr_id"] = tr_id
+        headers["tr_cont"] = tr_cont
+        return headers
     
     def _request_new_token(self) -> Tuple[str, str]:
-        url = f"{self.base_url}/oauth2/tokenP"
-        
-        payload = {
-            "grant_type": "client_credentials",
-            "appkey": self.app_key,
-            "appsecret": self.app_secret
-        }
-        
-        headers = {
-            "Content-Type": "application/json",
-            "Accept": "text/plain",
-            "charset": "UTF-8"
-        }
-        
-        response = requests.post(url, data=json.dumps(payload), headers=headers)
+        response = kis_session.post(
+            self._token_url,
+            data=self._token_body,
+            headers=self._token_headers,
+            timeout=(3, 10)
+        )
         
         if response.status_code != 200:
             raise Exception(f"Token request failed: {response.status_code}")
         
-        data = response.json()
+        data = loads(response.content)
         token = data.get('access_token')
         expired_time = data.get('access_token_token_expired')
         
@@ -94,8 +129,6 @@ class KisAuth:
         return token, expired_time
     
     def _save_token(self, token: str, expired_time: str) -> None:
-        token_file = self.token_storage_path / f"kis_{self.account_number}_{datetime.now().strftime('%Y%m%d')}.yaml"
-        
         token_data = {
             'token': token,
             'expired_time': expired_time,
@@ -104,62 +137,56 @@ class KisAuth:
             'created_at': datetime.now().isoformat()
         }
         
-        with open(token_file, 'w', encoding='utf-8') as f:
-            yaml.dump(token_data, f, default_flow_style=False)
+        with open(self._token_tmp_file, 'wb') as f:
+            f.write(dumps(token_data))
+        os.replace(self._token_tmp_file, self._token_file)
         
-        self._cleanup_old_tokens(keep_days=7)
-        
-        logger.debug(f"Token saved to {token_file}")
+        logger.debug("Token saved to %s", self._token_file)
+    
+    def _remove_legacy_tokens(self) -> None:
+        for legacy_file in self.token_storage_path.glob(f"kis_{self.account_number}_*.yaml"):
+            try:
+                legacy_file.unlink()
+                logger.debug("Removed legacy token file: %s", legacy_file)
+            except OSError as e:
+                logger.warning("Failed to remove legacy token file %s: %s", legacy_file, e)
     
-    def _load_saved_token(self) -> Optional[str]:
+    def _load_saved_token(self) -> Optional[Tuple[str, float]]:
         try:
-            token_file = self.token_storage_path / f"kis_{self.account_number}_{datetime.now().strftime('%Y%m%d')}.yaml"
-            
-            if not token_file.exists():
-                return None
-            
-            with open(token_file, 'r', encoding='utf-8') as f:
-                token_data = yaml.safe_load(f)
+            with open(self._token_file, 'rb') as f:
+                token_data = loads(f.read())
             
             token = token_data.get('token')
-            if token and self._is_token_valid_by_time(token_data.get('expired_time')):
-                return token
+            expires_at = self._parse_expired_time(token_data.get('expired_time'))
+            if token and self._is_token_valid_by_time(expires_at):
+                return token, expires_at
             
             return None
         
+        except FileNotFoundError:
+            return None
         except Exception as e:
-            logger.warning(f"Failed to load saved token: {e}")
+            logger.warning("Failed to load saved token: %s", e)
             return None
     
     def _is_token_valid(self, token: str) -> bool:
         return bool(token and len(token) > 50)
     
-    def _is_token_valid_by_time(self, expired_time: str) -> bool:
-        if not expired_time:
+    def _is_token_valid_by_time(self, expires_at: Optional[float]) -> bool:
+        if not expires_at:
             return False
         
-        try:
-            exp_dt = datetime.strptime(expired_time, '%Y-%m-%d %H:%M:%S')
-            now_dt = datetime.now()
-            return exp_dt > now_dt
-        except Exception:
-            return False
+        return time.time() + self.TOKEN_EXPIRY_MARGIN < expires_at
     
-    def _cleanup_old_tokens(self, keep_days: int = 7) -> None:
-        try:
-            cutoff_date = datetime.now() - timedelta(days=keep_days)
-            pattern = f"kis_{self.account_number}_*.yaml"
-            
-            for token_file in self.token_storage_path.glob(pattern):
-                try:
-                    date_str = token_file.stem.split('_')[-1]
-                    file_date = datetime.strptime(date_str, '%Y%m%d')
-                    
-                    if file_date < cutoff_date:
-                        token_file.unlink()
-                        logger.debug(f"Deleted old token file: {token_file}")
-                except (ValueError, IndexError):
-                    continue
+    @staticmethod
+    def _parse_expired_time(expired_time: str) -> Optional[float]:
+        if not expired_time:
+            return None
         
-        except Exception as e:
-            logger.warning(f"Failed to cleanup old tokens: {e}")
\ No newline at end of file
+        try:
+            return datetime(
+                int(expired_time[0:4]), int(expired_time[5:7]), int(expired_time[8:10]),
+                int(expired_time[11:13]), int(expired_time[14:16]), int(expired_time[17:19])
+            ).timestamp()
+        except (ValueError, TypeError, IndexError):
+            return None
\ No newline at end of file
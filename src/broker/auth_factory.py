@@ -25,11 +25,11 @@ class AuthFactory:
                 token_storage_path=token_storage_path
             )
             
-            logger.info(f"KisAuth created for account {secret_data['account_number']}")
+            logger.info("KisAuth created for account %s", secret_data['account_number'])
             return auth
         
         except Exception as e:
-            logger.error(f"Failed to create KisAuth from {secret_identifier}: {e}")
+            logger.error("Failed to create KisAuth from %s: %s", secret_identifier, e)
             raise
     
     @staticmethod
@@ -40,7 +40,7 @@ class AuthFactory:
             virtual_secret = SecretLoader.load_secret(virtual_secret_identifier)
             
             if not virtual_secret.get('is_virtual', False):
-                logger.info(f"Account {virtual_secret_identifier} is real account")
+                logger.info("Account %s is real account", virtual_secret_identifier)
                 return AuthFactory.create_from_secret(virtual_secret_identifier, token_storage_path)
             
             real_secret_identifier = SecretLoader.get_real_account_secret(virtual_secret_identifier)
@@ -48,7 +48,7 @@ class AuthFactory:
                 real_secret_identifier = default_real_secret_identifier
             
             if not real_secret_identifier:
-                logger.warning(f"No real account reference found for {virtual_secret_identifier}")
+                logger.warning("No real account reference found for %s", virtual_secret_identifier)
                 return AuthFactory.create_from_secret(virtual_secret_identifier, token_storage_path)
             
             real_secret = SecretLoader.load_secret(real_secret_identifier)
@@ -62,11 +62,11 @@ class AuthFactory:
                 token_storage_path=token_storage_path
             )
             
-            logger.info(f"Virtual KisAuth created with real account reference")
+            logger.info("Virtual KisAuth created with real account reference")
             return auth
         
         except Exception as e:
-            logger.error(f"Failed to create virtual KisAuth: {e}")
+            logger.error("Failed to create virtual KisAuth: %s", e)
             raise
     
     @staticmethod
@@ -1,21 +1,56 @@
+import math
 import time
 import requests
 import logging
-from typing import Dict, Optional, Set
-from datetime import datetime, time as dt_time, date
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+from datetime import datetime, time as dt_time, date, timezone
+from email.utils import parsedate_to_datetime
 
 from .auth import KisAuth
 from .auth_factory import AuthFactory
 from .secrets import SecretLoader
+from .session import kis_session
+from ..utils.json_codec import loads
 
 logger = logging.getLogger(__name__)
 
+_DAY_OPEN = dt_time(9, 0)
+_DAY_CLOSE = dt_time(15, 30)
+_NIGHT_OPEN = dt_time(18, 0)
+_NIGHT_CLOSE = dt_time(6, 0)
+_ACCOUNT_TYPES = frozenset(('STOCK', 'FUTURES', 'OVERSEAS'))
+
+
+def _build_session_table() -> Tuple[str, ...]:
+    table = []
+    for minute in range(24 * 60):
+        current_time = dt_time(minute // 60, minute % 60)
+        if _DAY_OPEN <= current_time <= _DAY_CLOSE:
+            table.append('DAY')
+        elif current_time >= _NIGHT_OPEN or current_time <= _NIGHT_CLOSE:
+            table.append('NIGHT')
+        else:
+            table.append('CLOSED')
+    return tuple(table)
+
+
+_SESSION_BY_MINUTE = _build_session_table()
+_CLOSING_MINUTES = frozenset((
+    _DAY_CLOSE.hour * 60 + _DAY_CLOSE.minute,
+    _NIGHT_CLOSE.hour * 60 + _NIGHT_CLOSE.minute
+))
+
 
 class KisApiError(Exception):
     pass
 
 
 class KisBroker:
+    REQUEST_TIMEOUT = (3.05, 30)
+    CIRCUIT_FAIL_MAX = 5
+    CIRCUIT_RESET_TIMEOUT = 30
+    
     TR_MAPPING = {
         ('FUTURES', 'DAY', False, 'ORDER'): 'TTTO1101U',
         ('FUTURES', 'NIGHT', False, 'ORDER'): 'TTTN1101U',
@@ -26,14 +61,22 @@ class KisBroker:
         ('FUTURES', 'NIGHT', False, 'INQUIRY'): 'STTN5201R',
     }
     
-    _holiday_cache = {}
-    _holiday_cache_date = None
+    FUTURES_STATUS_MAP = {
+        '접수': 'PENDING',
+        '체결': 'FILLED',
+        '거부': 'REJECTED',
+        '취소': 'CANCELLED',
+        '일부체결': 'PARTIAL_FILLED'
+    }
     
     def __init__(self, account_id: str, secret_identifier: str = None, 
                  is_virtual: bool = False, token_storage_path: str = "secrets/tokens/"):
         self.account_id = account_id
         self.secret_identifier = secret_identifier or account_id
         self.is_virtual = is_virtual
+        self._session = kis_session
+        self._consecutive_failures = 0
+        self._circuit_open_until = 0.0
         
         self.auth = AuthFactory.create_from_secret(
             self.secret_identifier, 
@@ -42,8 +85,17 @@ class KisBroker:
         
         self.secret_data = SecretLoader.load_secret(self.secret_identifier)
         self.account_type = self._get_account_type()
+        self._buy_params = {
+            "ORD_PRCS_DVSN_CD": "02",
+            "CANO": self.auth.account_number,
+            "ACNT_PRDT_CD": self.auth.account_product,
+            "SLL_BUY_DVSN_CD": "02"
+        }
+        self._sell_params = self._buy_params | {"SLL_BUY_DVSN_CD": "01"}
+        self._today_cache = (None, '')
+        self._tr_ids = self._tr_table(self.account_type, self.is_virtual)
         
-        logger.info(f"KisBroker initialized: {account_id} (Type: {self.account_type}, Virtual: {is_virtual})")
+        logger.info("KisBroker initialized: %s (Type: %s, Virtual: %s)", account_id, self.account_type, is_virtual)
     
     def buy(self, symbol: str, quantity: int, price: Optional[float] = None) -> str:
         if self.account_type == "FUTURES":
@@ -78,7 +130,7 @@ class KisBroker:
             }
         
         except Exception as e:
-            logger.error(f"Get order status failed: {e}")
+            logger.error("Get order status failed: %s", e)
             return {
                 'data': {'status': 'ERROR', 'order_id': order_id},
                 'status': 'error',
@@ -86,37 +138,23 @@ class KisBroker:
             }
     
     def _futures_buy(self, symbol: str, quantity: int, price: Optional[float] = None) -> str:
-        tr_id = self._get_tr_id('ORDER')
-        
-        params = {
-            "ORD_PRCS_DVSN_CD": "02",
-            "CANO": self.auth.account_number,
-            "ACNT_PRDT_CD": self.auth.account_product,
-            "SLL_BUY_DVSN_CD": "02",
-            "SHTN_PDNO": symbol,
-            "ORD_QTY": str(quantity),
-            "UNIT_PRICE": str(int(price)) if price else "0",
-            "ORD_DVSN_CD": "01" if price else "02"
-        }
-        
-        result = self._call_kis_api(
-            "/uapi/domestic-futureoption/v1/trading/order", 
-            tr_id, 
-            params
-        )
-        
-        order_id = result.get('output', {}).get('ODNO', 'unknown')
-        logger.info(f"Futures buy order: {order_id}")
+        order_id = self._futures_order(self._buy_params, symbol, quantity, price)
+        logger.info("Futures buy order: %s", order_id)
         return order_id
     
     def _futures_sell(self, symbol: str, quantity: int, price: Optional[float] = None) -> str:
+        order_id = self._futures_order(self._sell_params, symbol, quantity, price)
+        logger.info("Futures sell order: %s", order_id)
+        return order_id
+    
+    def _futures_order(self, side_params: Dict[str, str], symbol: str, quantity: int,
+                       price: Optional[float] = None) -> str:
+        if price and not price > 0:
+            raise KisApiError(f"Invalid price: {price}")
+        
         tr_id = self._get_tr_id('ORDER')
         
-        params = {
-            "ORD_PRCS_DVSN_CD": "02",
-            "CANO": self.auth.account_number,
-            "ACNT_PRDT_CD": self.auth.account_product,
-            "SLL_BUY_DVSN_CD": "01",
+        params = side_params | {
             "SHTN_PDNO": symbol,
             "ORD_QTY": str(quantity),
             "UNIT_PRICE": str(int(price)) if price else "0",
@@ -129,14 +167,53 @@ class KisBroker:
             params
         )
         
-        order_id = result.get('output', {}).get('ODNO', 'unknown')
-        logger.info(f"Futures sell order: {order_id}")
-        return order_id
+        return result.get('output', {}).get('ODNO', 'unknown')
     
     def _futures_order_status(self, order_id: str) -> Dict:
-        tr_id = self._get_tr_id('INQUIRY')
+        try:
+            search_order_num = int(order_id.strip().lstrip('0') or '0')
+        except (ValueError, AttributeError) as e:
+            logger.error("Invalid order_id format: %s, error: %s", order_id, e)
+            return {'status': 'INVALID', 'order_id': order_id}
+        
+        order = self._fetch_order_index().get(search_order_num)
+        
+        if order is None:
+            logger.warning("Order not found: %s", order_id)
+            return {'status': 'NOT_FOUND', 'order_id': order_id}
         
-        today = datetime.today().strftime("%Y%m%d")
+        try:
+            ord_qty = int(order.get('ord_qty', 0))
+            tot_ccld_qty = int(order.get('tot_ccld_qty', 0))
+            rjct_qty = int(order.get('rjct_qty', 0))
+        except (ValueError, TypeError) as e:
+            logger.error("Failed to parse quantities for order %s: %s", order_id, e)
+            return {'status': 'ERROR', 'order_id': order_id}
+        
+        if rjct_qty > 0:
+            status = 'REJECTED'
+        elif tot_ccld_qty >= ord_qty and ord_qty > 0:
+            status = 'FILLED'
+        elif tot_ccld_qty > 0:
+            status = 'PARTIAL_FILLED'
+        else:
+            status = 'PENDING'
+        
+        return {
+            'status': status,
+            'order_id': order_id,
+            'symbol': order.get('pdno', ''),
+            'quantity': ord_qty,
+            'filled_quantity': tot_ccld_qty,
+            'rejected_quantity': rjct_qty,
+            'price': float(order.get('avg_idx', 0)),
+            'order_time': order.get('ord_tmd', ''),
+            'side': 'BUY' if order.get('sll_buy_dvsn_cd') == '02' else 'SELL'
+        }
+    
+    def _fetch_order_index(self) -> Dict[int, Dict]:
+        tr_id = self._get_tr_id('INQUIRY')
+        today = self._get_today_str()
         
         params = {
             "CANO": self.auth.account_number,
@@ -162,56 +239,41 @@ class KisBroker:
             method="GET"
         )
         
-        orders = result.get('output1', [])
-
-        try:
-            search_order_num = int(order_id.strip().lstrip('0') or '0')
-        except (ValueError, AttributeError) as e:
-            logger.error(f"Invalid order_id format: {order_id}, error: {e}")
-            return {'status': 'INVALID', 'order_id': order_id}
+        return self._index_orders(result.get('output1', []))
+    
+    @staticmethod
+    def _index_orders(orders: List[Dict]) -> Dict[int, Dict]:
+        orders_by_num = {}
         
         for order in orders:
-            found_odno = order.get('odno', '').strip()
+            found_odno = order.get('odno', '')
             
             try:
-                found_order_num = int(found_odno.lstrip('0') or '0')
-                
-                if found_order_num == search_order_num:
-                    try:
-                        ord_qty = int(order.get('ord_qty', 0))
-                        tot_ccld_qty = int(order.get('tot_ccld_qty', 0))
-                        rjct_qty = int(order.get('rjct_qty', 0))
-                    except (ValueError, TypeError) as e:
-                        logger.error(f"Failed to parse quantities for order {order_id}: {e}")
-                        return {'status': 'ERROR', 'order_id': order_id}
-                    
-                    if rjct_qty > 0:
-                        status = 'REJECTED'
-                    elif tot_ccld_qty >= ord_qty and ord_qty > 0:
-                        status = 'FILLED'
-                    elif tot_ccld_qty > 0:
-                        status = 'PARTIAL_FILLED'
-                    else:
-                        status = 'PENDING'
-                    
-                    return {
-                        'status': status,
-                        'order_id': order_id,
-                        'symbol': order.get('pdno', ''),
-                        'quantity': ord_qty,
-                        'filled_quantity': tot_ccld_qty,
-                        'rejected_quantity': rjct_qty,
-                        'price': float(order.get('avg_idx', 0)),
-                        'order_time': order.get('ord_tmd', ''),
-                        'side': 'BUY' if order.get('sll_buy_dvsn_cd') == '02' else 'SELL'
-                    }
-                    
+                order_num = int(found_odno.strip().lstrip('0') or '0')
             except (ValueError, AttributeError) as e:
-                logger.warning(f"Failed to parse odno '{found_odno}': {e}")
+                logger.warning("Failed to parse odno '%s': %s", found_odno, e)
                 continue
+            
+            orders_by_num.setdefault(order_num, order)
         
-        logger.warning(f"Order not found: {order_id}")
-        return {'status': 'NOT_FOUND', 'order_id': order_id}
+        return orders_by_num
+    
+    def _get_today_str(self) -> str:
+        today = date.today()
+        cached_date, cached_str = self._today_cache
+        if today != cached_date:
+            cached_str = today.strftime("%Y%m%d")
+            self._today_cache = (today, cached_str)
+        return cached_str
+    
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _tr_table(cls, account_type: str, is_virtual: bool) -> Dict[Tuple[str, str], str]:
+        return {
+            (session, action): tr_id
+            for (mapped_type, session, virtual, action), tr_id in cls.TR_MAPPING.items()
+            if mapped_type == account_type and virtual == is_virtual
+        }
     
     def _get_tr_id(self, action: str, force_session: str = None) -> str:
         if force_session:
@@ -223,16 +285,15 @@ class KisBroker:
             logger.warning("Market is closed. Using NIGHT session as fallback.")
             session = 'NIGHT'
         
-        key = (self.account_type, session, self.is_virtual, action)
-        tr_id = self.TR_MAPPING.get(key)
+        tr_id = self._tr_ids.get((session, action))
         
         if not tr_id:
-            fallback_key = (self.account_type, 'NIGHT', self.is_virtual, action)
-            tr_id = self.TR_MAPPING.get(fallback_key)
-            logger.warning(f"TR ID not found for {key}, using fallback: {tr_id}")
-        
-        if not tr_id:
-            raise KisApiError(f"No TR ID found for {key}")
+            key = (self.account_type, session, self.is_virtual, action)
+            tr_id = self._tr_ids.get(('NIGHT', action))
+            logger.warning("TR ID not found for %s, using fallback: %s", key, tr_id)
+            
+            if not tr_id:
+                raise KisApiError(f"No TR ID found for {key}")
         
         return tr_id
     
@@ -243,31 +304,36 @@ class KisBroker:
         if target_time.weekday() >= 5:
             return 'CLOSED'
         
-        current_time = target_time.time()
-        
-        if dt_time(9, 0) <= current_time <= dt_time(15, 30):
-            return 'DAY'
-        
-        if current_time >= dt_time(18, 0) or current_time <= dt_time(6, 0):
-            return 'NIGHT'
+        minute = target_time.hour * 60 + target_time.minute
+        if minute in _CLOSING_MINUTES and (target_time.second or target_time.microsecond):
+            return 'CLOSED'
         
-        return 'CLOSED'
+        return _SESSION_BY_MINUTE[minute]
     
     def _call_kis_api(self, url_path: str, tr_id: str, params: Dict, 
                       method: str = "POST", tr_cont: str = "") -> Dict:
+        if self._circuit_open_until and time.monotonic() < self._circuit_open_until:
+            raise KisApiError("Circuit open: KIS API temporarily unavailable")
+        
         try:
             url = f"{self.auth.base_url}{url_path}"
             headers = self.auth.get_request_headers(tr_id, tr_cont)
             
             if method.upper() == "POST":
-                response = requests.post(url, json=params, headers=headers, timeout=30)
+                response = self._session.post(url, json=params, headers=headers, timeout=self.REQUEST_TIMEOUT)
             else:
-                response = requests.get(url, params=params, headers=headers, timeout=30)
+                response = self._session.get(url, params=params, headers=headers, timeout=self.REQUEST_TIMEOUT)
             
             if response.status_code != 200:
+                if response.status_code == 429 or response.status_code >= 500:
+                    self._record_failure(response.headers.get('Retry-After'))
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("KIS API %s returned %s: %s", url_path, response.status_code, response.text)
                 raise KisApiError(f"HTTP {response.status_code}: API call failed")
             
-            result = response.json()
+            self._consecutive_failures = 0
+            self._circuit_open_until = 0.0
+            result = loads(response.content)
             
             rt_cd = result.get('rt_cd', '1')
             if rt_cd != '0':
@@ -278,18 +344,52 @@ class KisBroker:
             return result
         
         except requests.exceptions.Timeout:
+            self._record_failure()
             raise KisApiError("API call timeout")
         except requests.exceptions.ConnectionError:
+            self._record_failure()
             raise KisApiError("API connection failed")
         except Exception as e:
             if isinstance(e, KisApiError):
                 raise
-            logger.error(f"KIS API call failed: {e}")
+            logger.error("KIS API call failed: %s", e)
             raise KisApiError(f"API call failed: {str(e)}")
     
+    def _record_failure(self, retry_after: Optional[str] = None) -> None:
+        self._consecutive_failures += 1
+        
+        open_for = self._parse_retry_after(retry_after)
+        
+        if not open_for and self._consecutive_failures >= self.CIRCUIT_FAIL_MAX:
+            open_for = self.CIRCUIT_RESET_TIMEOUT
+        
+        if open_for > 0:
+            self._circuit_open_until = time.monotonic() + open_for
+            logger.warning("KIS API circuit open for %ss (%s consecutive failures)",
+                           open_for, self._consecutive_failures)
+    
+    @staticmethod
+    def _parse_retry_after(retry_after: Optional[str]) -> int:
+        if not retry_after:
+            return 0
+        
+        try:
+            return max(int(retry_after), 0)
+        except ValueError:
+            pass
+        
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            return 0
+        
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(math.ceil(retry_at.timestamp() - time.time()), 0)
+    
     def _get_account_type(self) -> str:
         account_type = self.secret_data.get('account_type', '').upper()
-        if account_type in ['STOCK', 'FUTURES', 'OVERSEAS']:
+        if account_type in _ACCOUNT_TYPES:
             return account_type
         
         account_num = self.secret_data.get('account_number', '')
@@ -299,11 +399,4 @@ class KisBroker:
             return 'STOCK'
     
     def _map_futures_status(self, status_name: str) -> str:
-        status_map = {
-            '': 'PENDING',
-            '': 'FILLED',
-            '': 'REJECTED',
-            '': 'CANCELLED',
-            '': 'PARTIAL_FILLED'
-        }
-        return status_map.get(status_name, 'UNKNOWN')
\ No newline at end of file
+        return self.FUTURES_STATUS_MAP.get(status_name, 'UNKNOWN')
\ No newline at end of file
@@ -1,70 +1,94 @@
-import json
 import os
+import threading
 from pathlib import Path
 from typing import Dict, Optional, List
 import logging
 
+from ..utils.json_codec import loads, JSONDecodeError
+
 logger = logging.getLogger(__name__)
 
+_REQUIRED_FIELDS = frozenset(('app_key', 'app_secret', 'account_number', 'account_product'))
+
 
 class SecretLoader:
     _accounts_cache = None
+    _accounts_lock = threading.Lock()
+    _secret_cache: Dict[str, Dict] = {}
     
     @staticmethod
     def load_secret(secret_identifier: str) -> Dict:
+        cached = SecretLoader._secret_cache.get(secret_identifier)
+        if cached is not None:
+            return cached
+        
         try:
             account_data = SecretLoader._load_from_env(secret_identifier)
             if account_data:
-                logger.debug(f"Secret loaded from environment: {secret_identifier}")
+                logger.debug("Secret loaded from environment: %s", secret_identifier)
+                SecretLoader._secret_cache[secret_identifier] = account_data
                 return account_data
             
             if secret_identifier.endswith('.json') or '/' in secret_identifier:
                 account_data = SecretLoader._load_from_file(secret_identifier)
                 if account_data:
-                    logger.debug(f"Secret loaded from file: {secret_identifier}")
+                    logger.debug("Secret loaded from file: %s", secret_identifier)
+                    SecretLoader._secret_cache[secret_identifier] = account_data
                     return account_data
             
             raise FileNotFoundError(f"Secret not found: {secret_identifier}")
         
         except Exception as e:
-            logger.error(f"Failed to load secret {secret_identifier}: {e}")
+            logger.error("Failed to load secret %s: %s", secret_identifier, e)
             raise
     
     @staticmethod
     def _load_from_env(account_id: str) -> Optional[Dict]:
+        accounts = SecretLoader._get_env_accounts()
+        if not accounts:
+            return None
+        
+        return accounts.get(account_id)
+    
+    @staticmethod
+    def _get_env_accounts() -> Optional[Dict[str, Dict]]:
+        if SecretLoader._accounts_cache is None:
+            with SecretLoader._accounts_lock:
+                if SecretLoader._accounts_cache is None:
+                    SecretLoader._accounts_cache = SecretLoader._build_env_accounts()
+        
+        return SecretLoader._accounts_cache
+    
+    @staticmethod
+    def _build_env_accounts() -> Optional[Dict[str, Dict]]:
         try:
-            if SecretLoader._accounts_cache is None:
-                accounts_json = os.getenv('ACCOUNTS_CONFIG')
-                if not accounts_json:
-                    return None
-                
-                accounts_list = json.loads(accounts_json)
-                if not isinstance(accounts_list, list):
-                    logger.error("ACCOUNTS_CONFIG must be a JSON array")
-                    return None
-                
-                SecretLoader._accounts_cache = {
-                    account.get('id', ''): account 
-                    for account in accounts_list 
-                    if isinstance(account, dict) and account.get('id')
-                }
-                
-                logger.info(f"Loaded {len(SecretLoader._accounts_cache)} accounts from environment")
+            accounts_json = os.getenv('ACCOUNTS_CONFIG')
+            if not accounts_json:
+                return None
             
-            account_data = SecretLoader._accounts_cache.get(account_id)
-            if account_data:
-                if SecretLoader.validate_secret(account_data):
-                    return account_data
+            accounts_list = loads(accounts_json)
+            if not isinstance(accounts_list, list):
+                logger.error("ACCOUNTS_CONFIG must be a JSON array")
+                return None
+            
+            accounts = {}
+            for account in accounts_list:
+                if not isinstance(account, dict) or not account.get('id'):
+                    continue
+                
+                if SecretLoader.validate_secret(account):
+                    accounts[account['id']] = account
                 else:
-                    logger.error(f"Invalid account data for {account_id}")
+                    logger.error("Invalid account data for %s", account['id'])
             
-            return None
+            logger.info("Loaded %s accounts from environment", len(accounts))
+            return accounts
         
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid ACCOUNTS_CONFIG JSON: {e}")
+        except JSONDecodeError as e:
+            logger.error("Invalid ACCOUNTS_CONFIG JSON: %s", e)
             return None
         except Exception as e:
-            logger.error(f"Error loading from environment: {e}")
+            logger.error("Error loading from environment: %s", e)
             return None
     
     @staticmethod
@@ -74,30 +98,25 @@ class SecretLoader:
             if not path.exists():
                 raise FileNotFoundError(f"Secret file not found: {file_path}")
             
-            with open(path, 'r', encoding='utf-8') as f:
-                secret_data = json.load(f)
+            with open(path, 'rb') as f:
+                secret_data = loads(f.read())
             
-            required_fields = ['app_key', 'app_secret', 'account_number', 'account_product']
-            missing_fields = [field for field in required_fields if field not in secret_data]
-            
-            if missing_fields:
+            if not _REQUIRED_FIELDS <= secret_data.keys():
+                missing_fields = sorted(_REQUIRED_FIELDS - secret_data.keys())
                 raise ValueError(f"Missing required fields in secret file: {missing_fields}")
             
             return secret_data
         
         except Exception as e:
-            logger.error(f"Failed to load secret from file {file_path}: {e}")
+            logger.error("Failed to load secret from file %s: %s", file_path, e)
             raise
     
     @staticmethod
     def validate_secret(secret_data: Dict) -> bool:
         try:
-            required_fields = ['app_key', 'app_secret', 'account_number', 'account_product']
-            if not all(field in secret_data for field in required_fields):
-                return False
-            
-            if not all(str(secret_data[field]).strip() for field in required_fields):
-                return False
+            for field in _REQUIRED_FIELDS:
+                if not str(secret_data[field]).strip():
+                    return False
             
             if len(str(secret_data['account_number'])) != 8:
                 return False
@@ -107,8 +126,10 @@ class SecretLoader:
             
             return True
         
+        except KeyError:
+            return False
         except Exception as e:
-            logger.error(f"Secret validation error: {e}")
+            logger.error("Secret validation error: %s", e)
             return False
     
     @staticmethod
@@ -133,7 +154,7 @@ class SecretLoader:
             return None
         
         except Exception as e:
-            logger.warning(f"Failed to get real account reference: {e}")
+            logger.warning("Failed to get real account reference: %s", e)
             return None
     
     @staticmethod
@@ -141,11 +162,9 @@ class SecretLoader:
         account_ids = []
         
         try:
-            if SecretLoader._accounts_cache is None:
-                SecretLoader._load_from_env('dummy')
-            
-            if SecretLoader._accounts_cache:
-                account_ids.extend(SecretLoader._accounts_cache.keys())
+            accounts = SecretLoader._get_env_accounts()
+            if accounts:
+                account_ids.extend(accounts.keys())
         except Exception:
             pass
         
@@ -153,4 +172,5 @@ class SecretLoader:
     
     @staticmethod
     def clear_cache():
-        SecretLoader._accounts_cache = None
\ No newline at end of file
+        SecretLoader._accounts_cache = None
+        SecretLoader._secret_cache = {}
\ No newline at end of file
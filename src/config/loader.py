@@ -1,81 +1,165 @@
 import yaml
 import os
+from copy import deepcopy
 from pathlib import Path
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, Tuple
+
+from ..utils.json_codec import loads, JSONDecodeError
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+_ENV_OVERRIDES = (
+    ('webhook', 'port', ('PORT', 'WEBHOOK_PORT'), int),
+    ('webhook', 'host', ('WEBHOOK_HOST',), str),
+)
+
+_PARSE_CACHE: Dict[Tuple[str, int, int], Dict[str, Any]] = {}
+_MISSING = object()
 
 
 class ConfigLoader:
     def __init__(self, config_path: str = "config/config.yaml"):
         self.config_path = Path(config_path)
         self._config = self._load_config()
+        self._build_token_index()
+        self._build_views()
+        self._get_cache: Dict[str, Any] = {}
     
     def _load_config(self) -> Dict[str, Any]:
-        if not self.config_path.exists():
+        try:
+            stat = self.config_path.stat()
+        except FileNotFoundError:
             raise FileNotFoundError(f"Config file not found: {self.config_path}")
         
-        try:
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
+        cache_key = (str(self.config_path.resolve()), stat.st_mtime_ns, stat.st_size)
+        
+        parsed = _PARSE_CACHE.get(cache_key)
+        if parsed is None:
+            parsed = self._parse_file()
             
-            self._override_with_env(config)
-            return config
+            for stale_key in [key for key in _PARSE_CACHE if key[0] == cache_key[0]]:
+                del _PARSE_CACHE[stale_key]
+            _PARSE_CACHE[cache_key] = parsed
         
-        except yaml.YAMLError as e:
-            raise ValueError(f"Invalid YAML config: {e}")
+        self._config_mtime_ns = stat.st_mtime_ns
+        config = deepcopy(parsed)
+        self._override_with_env(config)
+        return config
     
-    def _override_with_env(self, config: Dict) -> None:
-        webhook_config = config.setdefault('webhook', {})
+    def _parse_file(self) -> Dict[str, Any]:
+        suffix = self.config_path.suffix.lower()
         
-        if webhook_port := os.getenv('WEBHOOK_PORT'):
-            webhook_config['port'] = int(webhook_port)
+        if suffix == '.toml':
+            if tomllib is None:
+                raise ValueError("TOML config requires Python 3.11+")
+            try:
+                with open(self.config_path, 'rb') as f:
+                    return tomllib.load(f)
+            except tomllib.TOMLDecodeError as e:
+                raise ValueError(f"Invalid TOML config: {e}")
         
-        if webhook_host := os.getenv('WEBHOOK_HOST'):
-            webhook_config['host'] = webhook_host
+        if suffix == '.json':
+            try:
+                with open(self.config_path, 'rb') as f:
+                    return loads(f.read())
+            except JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON config: {e}")
         
-        if port := os.getenv('PORT'):
-            webhook_config['port'] = int(port)
+        try:
+            with open(self.config_path, 'r', encoding='utf-8') as f:
+                return yaml.load(f, Loader=SafeLoader)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid YAML config: {e}")
     
-    def get_webhook_config(self) -> Dict[str, Any]:
-        webhook_config = self._config.get('webhook', {})
-        
-        if port := os.getenv('PORT'):
-            webhook_config['port'] = int(port)
+    def _build_token_index(self) -> None:
+        self._strategy_by_token = {}
+        for strategy_name, strategy_data in self._config.get('strategies', {}).items():
+            webhook_token = strategy_data.get('webhook_token')
+            if webhook_token and webhook_token not in self._strategy_by_token:
+                self._strategy_by_token[webhook_token] = {
+                    'name': strategy_name,
+                    **strategy_data
+                }
         
-        return webhook_config
+        accounts = self._config.get('accounts', {})
+        self._account_by_token = {
+            webhook_token: accounts.get(strategy.get('account_id'))
+            for webhook_token, strategy in self._strategy_by_token.items()
+            if strategy.get('is_active', False)
+        }
+    
+    def _build_views(self) -> None:
+        self._webhook_view = MappingProxyType(self._config.get('webhook', {}))
+        self._accounts_view = MappingProxyType(self._config.get('accounts', {}))
+        self._strategies_view = MappingProxyType(self._config.get('strategies', {}))
+    
+    def _override_with_env(self, config: Dict) -> None:
+        environ = os.environ
+        for section, key, env_names, cast in _ENV_OVERRIDES:
+            for env_name in env_names:
+                if value := environ.get(env_name):
+                    config.setdefault(section, {})[key] = cast(value)
+                    break
+    
+    def get_webhook_config(self) -> Mapping[str, Any]:
+        return self._webhook_view
     
     def get_account(self, account_id: str) -> Optional[Dict]:
-        accounts = self._config.get('accounts', {})
-        return accounts.get(account_id)
+        return self._accounts_view.get(account_id)
     
-    def get_all_accounts(self) -> Dict[str, Dict]:
-        return self._config.get('accounts', {})
+    def get_all_accounts(self) -> Mapping[str, Dict]:
+        return self._accounts_view
     
     def get_strategy_by_token(self, webhook_token: str) -> Optional[Dict]:
-        for strategy_name, strategy_data in self._config.get('strategies', {}).items():
-            if strategy_data.get('webhook_token') == webhook_token:
-                return {
-                    'name': strategy_name,
-                    **strategy_data
-                }
-        return None
+        return self._strategy_by_token.get(webhook_token)
     
-    def get_all_strategies(self) -> Dict[str, Dict]:
-        return self._config.get('strategies', {})
+    def get_account_by_token(self, webhook_token: str) -> Optional[Dict]:
+        return self._account_by_token.get(webhook_token)
+    
+    def get_all_strategies(self) -> Mapping[str, Dict]:
+        return self._strategies_view
     
     def get_token_storage_path(self) -> str:
         kis_config = self._config.get('kis_api', {})
         return kis_config.get('token_storage_path', 'secrets/tokens/')
     
     def reload(self) -> None:
-        self._config = self._load_config()
+        try:
+            unchanged = self.config_path.stat().st_mtime_ns == self._config_mtime_ns
+        except FileNotFoundError:
+            unchanged = False
+        
+        if unchanged:
+            self._override_with_env(self._config)
+        else:
+            self._config = self._load_config()
+            self._build_token_index()
+        self._build_views()
+        self._get_cache = {}
     
     def get(self, key: str, default: Any = None) -> Any:
-        keys = key.split('.')
+        value = self._get_cache.get(key, _MISSING)
+        if value is _MISSING:
+            value = self._resolve(key)
+            self._get_cache[key] = value
+        
+        return default if value is _MISSING else value
+    
+    def _resolve(self, key: str) -> Any:
         value = self._config
         
         try:
-            for k in keys:
+            for k in key.split('.'):
                 value = value[k]
             return value
         except (KeyError, TypeError):
-            return default
\ No newline at end of file
+            return _MISSING
\ No newline at end of file
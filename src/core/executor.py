@@ -1,5 +1,7 @@
 import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional
 from pathlib import Path
 
@@ -9,11 +11,15 @@ from ..config.loader import ConfigLoader
 
 logger = logging.getLogger(__name__)
 
+_FAILED_STATUSES = frozenset(('FAILED', 'REJECTED', 'CANCELLED'))
+
 
 class SignalExecutor:
     def __init__(self, config_path: str = "config/config.yaml"):
         self.config = ConfigLoader(config_path)
         self.brokers: Dict[str, KisBroker] = {}
+        self._brokers_lock = threading.Lock()
+        self._account_locks: Dict[str, threading.Lock] = {}
         self._emergency_stop = False
         
         logger.info("SignalExecutor initialized")
@@ -25,72 +31,106 @@ class SignalExecutor:
         
         valid, error = signal.validate()
         if not valid:
-            logger.error(f"Invalid signal: {error}")
+            logger.error("Invalid signal: %s", error)
             return ExecutionResult.fail(f"Invalid signal: {error}", signal)
         
         account_config = self._route_signal(signal)
         if not account_config:
-            logger.error(f"Account not found for token: {signal.webhook_token}")
+            logger.error("Account not found for token: %s", signal.webhook_token)
             return ExecutionResult.fail("Account not found", signal)
         
         if not account_config.get('is_active', False):
-            logger.warning(f"Account {account_config['account_id']} is inactive")
+            logger.warning("Account %s is inactive", account_config['account_id'])
             return ExecutionResult.fail("Account is inactive", signal)
         
         broker = self._get_broker(account_config)
         
-        try:
-            logger.info(f"Executing signal: {signal.action} {signal.symbol} x{signal.quantity}")
-            
-            if signal.action == 'BUY':
-                order_id = broker.buy(signal.symbol, signal.quantity, price=None)
-            else:
-                order_id = broker.sell(signal.symbol, signal.quantity, price=None)
-            
-            logger.info(f"Order placed: {order_id}")
+        with self._get_account_lock(account_config['account_id']):
+            if self._emergency_stop:
+                logger.warning("Emergency stop active, signal ignored")
+                return ExecutionResult.fail("Emergency stop is active", signal)
             
-            filled = self._wait_for_fill(broker, order_id, timeout=30)
+            try:
+                logger.info("Executing signal: %s %s x%s", signal.action, signal.symbol, signal.quantity)
+                
+                if signal.action == 'BUY':
+                    order_id = broker.buy(signal.symbol, signal.quantity, price=None)
+                else:
+                    order_id = broker.sell(signal.symbol, signal.quantity, price=None)
+                
+                logger.info("Order placed: %s", order_id)
+                
+                filled = self._wait_for_fill(broker, order_id, timeout=30)
+                
+                if filled:
+                    logger.info("Order filled: %s", order_id)
+                    return ExecutionResult.ok(order_id, signal, filled=True)
+                else:
+                    logger.warning("Order fill timeout: %s", order_id)
+                    return ExecutionResult.fail("Fill timeout", signal, order_id)
             
-            if filled:
-                logger.info(f"Order filled: {order_id}")
-                return ExecutionResult.ok(order_id, signal, filled=True)
-            else:
-                logger.warning(f"Order fill timeout: {order_id}")
-                return ExecutionResult.fail("Fill timeout", signal, order_id)
-        
-        except Exception as e:
-            logger.error(f"Execution failed: {e}")
-            return ExecutionResult.fail(str(e), signal)
+            except Exception as e:
+                logger.error("Execution failed: %s", e)
+                return ExecutionResult.fail(str(e), signal)
     
     def _route_signal(self, signal: Signal) -> Optional[dict]:
-        strategy = self.config.get_strategy_by_token(signal.webhook_token)
-        if not strategy:
-            return None
-        
-        if not strategy.get('is_active', False):
-            return None
-        
-        account_id = strategy['account_id']
-        return self.config.get_account(account_id)
+        return self.config.get_account_by_token(signal.webhook_token)
     
     def _get_broker(self, account_config: dict) -> KisBroker:
         account_id = account_config['account_id']
         
-        if account_id not in self.brokers:
-            token_path = self.config.get_token_storage_path()
-            
-            secret_identifier = account_config.get('secret_file', account_id)
-            
-            self.brokers[account_id] = KisBroker(
-                account_id=account_id,
-                secret_identifier=secret_identifier,
-                is_virtual=account_config.get('is_virtual', False),
-                token_storage_path=token_path
-            )
+        broker = self.brokers.get(account_id)
+        if broker is not None:
+            return broker
+        
+        with self._brokers_lock:
+            if account_id not in self.brokers:
+                token_path = self.config.get_token_storage_path()
+                
+                secret_identifier = account_config.get('secret_file', account_id)
+                
+                self.brokers[account_id] = KisBroker(
+                    account_id=account_id,
+                    secret_identifier=secret_identifier,
+                    is_virtual=account_config.get('is_virtual', False),
+                    token_storage_path=token_path
+                )
+                
+                logger.info("Broker created for account: %s (secret: %s)", account_id, secret_identifier)
             
-            logger.info(f"Broker created for account: {account_id} (secret: {secret_identifier})")
+            return self.brokers[account_id]
+    
+    def _get_account_lock(self, account_id: str) -> threading.Lock:
+        lock = self._account_locks.get(account_id)
+        if lock is not None:
+            return lock
+        
+        with self._brokers_lock:
+            return self._account_locks.setdefault(account_id, threading.Lock())
+    
+    def warmup(self, max_workers: int = 4) -> None:
+        accounts = [
+            account_config for account_config in self.config.get_all_accounts().values()
+            if account_config.get('is_active', False)
+        ]
+        if not accounts:
+            return
         
-        return self.brokers[account_id]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(accounts)),
+                                thread_name_prefix="warmup") as pool:
+            futures = [(account_config, pool.submit(self._warm_account, account_config))
+                       for account_config in accounts]
+            
+            for account_config, future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.warning("Warmup failed for %s: %s", account_config.get('account_id'), e)
+    
+    def _warm_account(self, account_config: dict) -> None:
+        broker = self._get_broker(account_config)
+        broker.auth.get_valid_token()
+        logger.info("Broker warmed up: %s", broker.account_id)
     
     def _wait_for_fill(self, broker: KisBroker, order_id: str, timeout: int = 30) -> bool:
         start_time = time.time()
@@ -103,14 +143,14 @@ class SignalExecutor:
                 
                 if status == 'FILLED':
                     return True
-                elif status in ['FAILED', 'REJECTED', 'CANCELLED']:
-                    logger.error(f"Order failed with status: {status}")
+                elif status in _FAILED_STATUSES:
+                    logger.error("Order failed with status: %s", status)
                     return False
                 
                 time.sleep(2)
             
             except Exception as e:
-                logger.warning(f"Status check error: {e}")
+                logger.warning("Status check error: %s", e)
                 time.sleep(2)
         
         return False
@@ -1,7 +1,9 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional
 
+_VALID_ACTIONS = frozenset(('BUY', 'SELL'))
+
 
 @dataclass
 class Signal:
@@ -10,6 +12,7 @@ class Signal:
     quantity: int
     webhook_token: str
     timestamp: datetime = None
+    _validation: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
     
     def __post_init__(self):
         if self.timestamp is None:
@@ -20,10 +23,15 @@ class Signal:
         self.webhook_token = self.webhook_token.strip()
     
     def validate(self) -> tuple[bool, Optional[str]]:
+        if self._validation is None:
+            self._validation = self._validate()
+        return self._validation
+    
+    def _validate(self) -> tuple[bool, Optional[str]]:
         if not self.symbol:
             return False, "Symbol is required"
         
-        if self.action not in ['BUY', 'SELL']:
+        if self.action not in _VALID_ACTIONS:
             return False, f"Invalid action: {self.action}"
         
         if self.quantity <= 0:
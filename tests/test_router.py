@@ -0,0 +1,612 @@
+"""
+SignalRouter 단위 테스트
+외부 API 호출 없이 브로커 회로 차단기, 설정 로더, 웹훅 중복 제거 동작을 검증합니다.
+"""
+
+import pytest
+import asyncio
+import json
+import os
+import threading
+import yaml
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, time as dt_time
+from email.utils import formatdate
+from unittest.mock import Mock
+
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import httpx
+import requests
+
+from src.api.webhook import create_app
+from src.broker.auth import KisAuth
+from src.broker.kis_api import KisBroker, KisApiError
+from src.broker.secrets import SecretLoader
+from src.broker.session import create_session
+from src.config.loader import ConfigLoader
+from src.core.executor import SignalExecutor
+from src.models.signal import ExecutionResult, Signal
+
+
+# ===================== 픽스처 =====================
+
+@pytest.fixture
+def temp_secret(tmp_path):
+    """임시 시크릿 파일"""
+    secret_path = tmp_path / "futures_test.json"
+    secret_path.write_text(json.dumps({
+        'app_key': 'test_app_key_12345',
+        'app_secret': 'test_app_secret_67890',
+        'account_number': '50123456',
+        'account_product': '03',
+        'account_type': 'FUTURES',
+        'is_virtual': False
+    }), encoding='utf-8')
+    
+    yield str(secret_path)
+    SecretLoader.clear_cache()
+
+
+@pytest.fixture
+def broker(temp_secret, tmp_path):
+    """네트워크 호출이 차단된 선물 브로커"""
+    broker = KisBroker('futures_test', temp_secret, token_storage_path=str(tmp_path / "tokens"))
+    broker.auth.get_request_headers = Mock(return_value={})
+    broker._session = Mock()
+    return broker
+
+
+def make_response(status_code=200, body=None, headers=None):
+    response = Mock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.content = json.dumps(body if body is not None else {'rt_cd': '0'}).encode()
+    response.text = response.content.decode()
+    return response
+
+
+# ===================== 회로 차단기 =====================
+
+class TestCircuitBreaker:
+    """KisBroker 회로 차단기 테스트"""
+    
+    def test_opens_after_consecutive_failures(self, broker):
+        broker._session.get.return_value = make_response(503)
+        
+        for _ in range(broker.CIRCUIT_FAIL_MAX):
+            with pytest.raises(KisApiError, match="HTTP 503"):
+                broker._call_kis_api("/test", "TR", {}, method="GET")
+        
+        assert broker._consecutive_failures == broker.CIRCUIT_FAIL_MAX
+        assert broker._circuit_open_until > time.monotonic()
+        
+        with pytest.raises(KisApiError, match="Circuit open"):
+            broker._call_kis_api("/test", "TR", {}, method="GET")
+        assert broker._session.get.call_count == broker.CIRCUIT_FAIL_MAX
+    
+    def test_client_errors_do_not_count(self, broker):
+        broker._session.post.return_value = make_response(400)
+        
+        for _ in range(broker.CIRCUIT_FAIL_MAX + 1):
+            with pytest.raises(KisApiError, match="HTTP 400"):
+                broker._call_kis_api("/test", "TR", {})
+        
+        assert broker._consecutive_failures == 0
+        assert broker._circuit_open_until == 0.0
+    
+    def test_timeout_and_connection_errors_count(self, broker):
+        broker._session.post.side_effect = [
+            requests.exceptions.Timeout(),
+            requests.exceptions.ConnectionError()
+        ]
+        
+        with pytest.raises(KisApiError, match="timeout"):
+            broker._call_kis_api("/test", "TR", {})
+        with pytest.raises(KisApiError, match="connection failed"):
+            broker._call_kis_api("/test", "TR", {})
+        
+        assert broker._consecutive_failures == 2
+    
+    def test_retry_after_seconds_opens_immediately(self, broker):
+        broker._session.post.return_value = make_response(429, headers={'Retry-After': '7'})
+        
+        before = time.monotonic()
+        with pytest.raises(KisApiError, match="HTTP 429"):
+            broker._call_kis_api("/test", "TR", {})
+        
+        assert broker._consecutive_failures == 1
+        assert before + 7 <= broker._circuit_open_until <= time.monotonic() + 7
+    
+    def test_retry_after_http_date(self, broker):
+        retry_at = formatdate(time.time() + 20, usegmt=True)
+        broker._session.post.return_value = make_response(503, headers={'Retry-After': retry_at})
+        
+        with pytest.raises(KisApiError):
+            broker._call_kis_api("/test", "TR", {})
+        
+        remaining = broker._circuit_open_until - time.monotonic()
+        assert 18 <= remaining <= 21
+    
+    def test_session_retry_leaves_retry_after_to_breaker(self):
+        retry = create_session().get_adapter("https://").max_retries
+        
+        assert 429 in retry.status_forcelist
+        assert retry.respect_retry_after_header is False
+    
+    @pytest.mark.parametrize("retry_after, expected", [
+        (None, 0),
+        ("", 0),
+        ("5", 5),
+        ("-3", 0),
+        ("soon", 0),
+        (formatdate(time.time() - 60, usegmt=True), 0),
+    ])
+    def test_parse_retry_after(self, retry_after, expected):
+        assert KisBroker._parse_retry_after(retry_after) == expected
+    
+    def test_half_open_trial_failure_reopens(self, broker):
+        broker._session.get.return_value = make_response(503)
+        for _ in range(broker.CIRCUIT_FAIL_MAX):
+            with pytest.raises(KisApiError):
+                broker._call_kis_api("/test", "TR", {}, method="GET")
+        
+        broker._circuit_open_until = time.monotonic() - 1
+        
+        with pytest.raises(KisApiError, match="HTTP 503"):
+            broker._call_kis_api("/test", "TR", {}, method="GET")
+        assert broker._session.get.call_count == broker.CIRCUIT_FAIL_MAX + 1
+        assert broker._circuit_open_until > time.monotonic()
+    
+    def test_half_open_trial_success_resets(self, broker):
+        broker._session.get.return_value = make_response(503)
+        for _ in range(broker.CIRCUIT_FAIL_MAX):
+            with pytest.raises(KisApiError):
+                broker._call_kis_api("/test", "TR", {}, method="GET")
+        
+        broker._circuit_open_until = time.monotonic() - 1
+        broker._session.get.return_value = make_response(200, {'rt_cd': '0', 'output': {}})
+        
+        assert broker._call_kis_api("/test", "TR", {}, method="GET")['rt_cd'] == '0'
+        assert broker._consecutive_failures == 0
+        assert broker._circuit_open_until == 0.0
+        
+        broker._session.get.return_value = make_response(503)
+        with pytest.raises(KisApiError, match="HTTP 503"):
+            broker._call_kis_api("/test", "TR", {}, method="GET")
+        assert broker._circuit_open_until == 0.0
+
+
+# ===================== 장 운영 시간 =====================
+
+class TestMarketSession:
+    """KisBroker 장 구분 및 TR ID 선택 테스트"""
+    
+    @staticmethod
+    def legacy_session(target_time):
+        if target_time.weekday() >= 5:
+            return 'CLOSED'
+        current_time = target_time.time()
+        if dt_time(9, 0) <= current_time <= dt_time(15, 30):
+            return 'DAY'
+        if current_time >= dt_time(18, 0) or current_time <= dt_time(6, 0):
+            return 'NIGHT'
+        return 'CLOSED'
+    
+    @pytest.mark.parametrize("hour, minute, second, microsecond, expected", [
+        (9, 0, 0, 0, 'DAY'),
+        (15, 30, 0, 0, 'DAY'),
+        (15, 30, 0, 1, 'CLOSED'),
+        (15, 30, 30, 0, 'CLOSED'),
+        (17, 59, 59, 0, 'CLOSED'),
+        (18, 0, 0, 0, 'NIGHT'),
+        (6, 0, 0, 0, 'NIGHT'),
+        (6, 0, 1, 0, 'CLOSED'),
+        (8, 59, 59, 0, 'CLOSED'),
+    ])
+    def test_session_boundaries(self, broker, hour, minute, second, microsecond, expected):
+        target_time = datetime(2024, 1, 3, hour, minute, second, microsecond)
+        assert broker._get_market_session(target_time) == expected
+    
+    def test_matches_time_comparisons_for_every_second(self, broker):
+        start = datetime(2024, 1, 3)
+        for offset in range(0, 24 * 60 * 60, 1):
+            target_time = start + timedelta(seconds=offset)
+            assert broker._get_market_session(target_time) == self.legacy_session(target_time)
+    
+    def test_weekend_is_closed(self, broker):
+        assert broker._get_market_session(datetime(2024, 1, 6, 10, 0)) == 'CLOSED'
+    
+    def test_closing_seconds_use_night_tr_id(self, broker, monkeypatch):
+        monkeypatch.setattr(broker, '_get_market_session', lambda: 'CLOSED')
+        assert broker._get_tr_id('ORDER') == 'TTTN1101U'
+        
+        monkeypatch.setattr(broker, '_get_market_session', lambda: 'DAY')
+        assert broker._get_tr_id('ORDER') == 'TTTO1101U'
+
+
+# ===================== 설정 로더 =====================
+
+CONFIG_DATA = {
+    'webhook': {'host': '0.0.0.0', 'port': 8000},
+    'accounts': {
+        'futures_test': {
+            'account_id': 'futures_test',
+            'type': 'FUTURES',
+            'secret_file': 'futures_test.json',
+            'is_virtual': False,
+            'is_active': True
+        }
+    },
+    'strategies': {
+        'TEST_STRATEGY': {
+            'account_id': 'futures_test',
+            'webhook_token': 'test_token_123',
+            'is_active': True
+        }
+    }
+}
+
+CONFIG_TOML = """
+[webhook]
+host = "0.0.0.0"
+port = 8000
+
+[accounts.futures_test]
+account_id = "futures_test"
+type = "FUTURES"
+secret_file = "futures_test.json"
+is_virtual = false
+is_active = true
+
+[strategies.TEST_STRATEGY]
+account_id = "futures_test"
+webhook_token = "test_token_123"
+is_active = true
+"""
+
+
+class TestConfigLoader:
+    """ConfigLoader 파일 형식별 로딩 테스트"""
+    
+    @pytest.fixture(autouse=True)
+    def clear_env(self, monkeypatch):
+        for env_name in ('PORT', 'WEBHOOK_PORT', 'WEBHOOK_HOST'):
+            monkeypatch.delenv(env_name, raising=False)
+    
+    @pytest.mark.parametrize("filename, content", [
+        ("config.yaml", yaml.safe_dump(CONFIG_DATA)),
+        ("config.json", json.dumps(CONFIG_DATA)),
+        ("config.toml", CONFIG_TOML),
+    ])
+    def test_formats_load_same_config(self, tmp_path, filename, content):
+        config_path = tmp_path / filename
+        config_path.write_text(content, encoding='utf-8')
+        
+        config = ConfigLoader(str(config_path))
+        
+        assert config.get('webhook.port') == 8000
+        assert config.get_account('futures_test')['type'] == 'FUTURES'
+        assert config.get_account_by_token('test_token_123')['account_id'] == 'futures_test'
+        assert config.get_strategy_by_token('test_token_123')['name'] == 'TEST_STRATEGY'
+    
+    @pytest.mark.parametrize("filename, content, message", [
+        ("config.yaml", "webhook: [unclosed", "Invalid YAML config"),
+        ("config.json", "{\"webhook\": ", "Invalid JSON config"),
+        ("config.toml", "[webhook]\nport = ", "Invalid TOML config"),
+    ])
+    def test_invalid_files_raise_value_error(self, tmp_path, filename, content, message):
+        config_path = tmp_path / filename
+        config_path.write_text(content, encoding='utf-8')
+        
+        with pytest.raises(ValueError, match=message):
+            ConfigLoader(str(config_path))
+    
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            ConfigLoader(str(tmp_path / "missing.toml"))
+    
+    def test_env_overrides_apply_to_toml(self, tmp_path, monkeypatch):
+        config_path = tmp_path / "config.toml"
+        config_path.write_text(CONFIG_TOML, encoding='utf-8')
+        monkeypatch.setenv('WEBHOOK_PORT', '7000')
+        monkeypatch.setenv('PORT', '9000')
+        
+        assert ConfigLoader(str(config_path)).get_webhook_config()['port'] == 9000
+    
+    def test_reload_applies_env_changes_to_unchanged_file(self, tmp_path, monkeypatch):
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(yaml.safe_dump(CONFIG_DATA), encoding='utf-8')
+        config = ConfigLoader(str(config_path))
+        assert config.get('webhook.port') == 8000
+        
+        monkeypatch.setenv('PORT', '9000')
+        config.reload()
+        
+        assert config.get_webhook_config()['port'] == 9000
+        assert config.get('webhook.port') == 9000
+
+    
+    def test_failed_reload_keeps_raising(self, tmp_path):
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(yaml.safe_dump(CONFIG_DATA), encoding='utf-8')
+        config = ConfigLoader(str(config_path))
+        mtime_ns = config_path.stat().st_mtime_ns
+        
+        config_path.write_text("webhook: [unclosed", encoding='utf-8')
+        os.utime(config_path, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+        for _ in range(2):
+            with pytest.raises(ValueError, match="Invalid YAML config"):
+                config.reload()
+        
+        config_path.write_text(yaml.safe_dump(dict(CONFIG_DATA, webhook={'port': 8100})), encoding='utf-8')
+        os.utime(config_path, ns=(mtime_ns + 2 * 10**9, mtime_ns + 2 * 10**9))
+        config.reload()
+        assert config.get('webhook.port') == 8100
+
+# ===================== 토큰 저장소 =====================
+
+class TestKisAuthStorage:
+    """KisAuth 토큰 파일 저장소 테스트"""
+    
+    def test_legacy_yaml_tokens_removed(self, tmp_path):
+        tmp_path.joinpath("kis_50123456_20240101.yaml").write_text("token: old")
+        tmp_path.joinpath("kis_50123456_20240102.yaml").write_text("token: old")
+        tmp_path.joinpath("kis_99999999_20240101.yaml").write_text("token: other")
+        
+        KisAuth('app_key', 'app_secret', '50123456', '03', token_storage_path=str(tmp_path))
+        
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["kis_99999999_20240101.yaml"]
+    
+    def test_token_round_trip(self, tmp_path):
+        auth = KisAuth('app_key', 'app_secret', '50123456', '03', token_storage_path=str(tmp_path))
+        assert auth._load_saved_token() is None
+        
+        auth._save_token('t' * 64, '2099-01-01 00:00:00')
+        
+        token, expires_at = auth._load_saved_token()
+        assert token == 't' * 64
+        assert expires_at == datetime(2099, 1, 1).timestamp()
+        assert [p.name for p in tmp_path.iterdir()] == ["kis_50123456.json"]
+
+
+# ===================== 신호 실행기 =====================
+
+class TestSignalExecutor:
+    """SignalExecutor 계좌별 직렬 실행 테스트"""
+    
+    @pytest.fixture
+    def executor(self, tmp_path):
+        config_data = dict(CONFIG_DATA, accounts={
+            **CONFIG_DATA['accounts'],
+            'futures_other': dict(CONFIG_DATA['accounts']['futures_test'], account_id='futures_other')
+        }, strategies={
+            **CONFIG_DATA['strategies'],
+            'OTHER_STRATEGY': {'account_id': 'futures_other', 'webhook_token': 'other_token', 'is_active': True}
+        })
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(yaml.safe_dump(config_data), encoding='utf-8')
+        
+        executor = SignalExecutor(str(config_path))
+        executor._get_broker = lambda account_config: self.make_broker(account_config['account_id'])
+        executor._wait_for_fill = Mock(return_value=True)
+        return executor
+    
+    @pytest.fixture(autouse=True)
+    def reset_tracking(self):
+        self.brokers = {}
+        self.running = {}
+        self.max_running = {}
+        self.tracking_lock = threading.Lock()
+    
+    def make_broker(self, account_id):
+        if account_id not in self.brokers:
+            def place_order(symbol, quantity, price=None):
+                with self.tracking_lock:
+                    for key in (account_id, 'total'):
+                        self.running[key] = self.running.get(key, 0) + 1
+                        self.max_running[key] = max(self.max_running.get(key, 0), self.running[key])
+                time.sleep(0.05)
+                with self.tracking_lock:
+                    for key in (account_id, 'total'):
+                        self.running[key] -= 1
+                return "0000012345"
+            
+            broker = Mock()
+            broker.buy.side_effect = place_order
+            broker.sell.side_effect = place_order
+            self.brokers[account_id] = broker
+        return self.brokers[account_id]
+    
+    def run_concurrently(self, executor, signals):
+        with ThreadPoolExecutor(max_workers=len(signals)) as pool:
+            return list(pool.map(executor.execute, signals))
+    
+    def test_same_account_signals_do_not_overlap(self, executor):
+        signals = [
+            Signal(symbol='101W09', action='SELL', quantity=1, webhook_token='test_token_123'),
+            Signal(symbol='101W09', action='SELL', quantity=1, webhook_token='test_token_123'),
+            Signal(symbol='101W09', action='SELL', quantity=1, webhook_token='test_token_123'),
+        ]
+        
+        results = self.run_concurrently(executor, signals)
+        
+        assert all(result.success for result in results)
+        assert self.max_running['futures_test'] == 1
+        assert self.brokers['futures_test'].sell.call_count == 3
+    
+    def test_different_accounts_run_in_parallel(self, executor):
+        signals = [
+            Signal(symbol='101W09', action='BUY', quantity=1, webhook_token='test_token_123'),
+            Signal(symbol='101W09', action='BUY', quantity=1, webhook_token='other_token'),
+        ]
+        
+        results = self.run_concurrently(executor, signals)
+        
+        assert all(result.success for result in results)
+        assert self.max_running == {'futures_test': 1, 'futures_other': 1, 'total': 2}
+    
+    def test_emergency_stop_applies_to_queued_signals(self, executor):
+        signal = Signal(symbol='101W09', action='BUY', quantity=1, webhook_token='test_token_123')
+        lock = executor._get_account_lock('futures_test')
+        
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            with lock:
+                future = pool.submit(executor.execute, signal)
+                time.sleep(0.05)
+                executor.emergency_stop()
+            
+            result = future.result(timeout=5)
+        
+        assert not result.success
+        assert result.error == "Emergency stop is active"
+        assert not self.brokers['futures_test'].buy.called
+
+
+# ===================== 웹훅 중복 제거 =====================
+
+@pytest.fixture
+def make_app(tmp_path):
+    apps = []
+    
+    def factory(dedupe_window=60):
+        config_data = dict(CONFIG_DATA, webhook={'dedupe_window': dedupe_window, 'warmup': False})
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(yaml.safe_dump(config_data), encoding='utf-8')
+        
+        app = create_app(str(config_path))
+        app.state.executor.execute = Mock(
+            side_effect=lambda signal: ExecutionResult.ok("0000012345", signal, filled=True)
+        )
+        apps.append(app)
+        return app
+    
+    yield factory
+    
+    for app in apps:
+        app.state.executor_pool.shutdown()
+
+
+def post_signals(app, *payloads):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [await client.post("/webhook", json=payload) for payload in payloads]
+    
+    return asyncio.run(scenario())
+
+
+SIGNAL = {
+    'symbol': '101W09',
+    'action': 'BUY',
+    'quantity': 1,
+    'webhook_token': 'test_token_123'
+}
+
+
+class TestWebhookDedupe:
+    """웹훅 중복 전송 처리 테스트"""
+    
+    def test_replay_returns_first_response(self, make_app):
+        app = make_app()
+        payload = dict(SIGNAL, signal_id='2024-01-03T09:00:00Z')
+        
+        first, second = post_signals(app, payload, payload)
+        
+        assert first.status_code == second.status_code == 200
+        assert first.json() == second.json()
+        assert first.json()['order_id'] == "0000012345"
+        assert app.state.executor.execute.call_count == 1
+    
+    def test_same_body_without_signal_id_is_executed(self, make_app):
+        app = make_app()
+        
+        first, second = post_signals(app, SIGNAL, SIGNAL)
+        
+        assert first.status_code == second.status_code == 200
+        assert app.state.executor.execute.call_count == 2
+    
+    def test_different_signal_ids_are_executed(self, make_app):
+        app = make_app()
+        
+        post_signals(app, dict(SIGNAL, signal_id='a'), dict(SIGNAL, signal_id='b'))
+        
+        assert app.state.executor.execute.call_count == 2
+    
+    def test_disabled_window_executes_every_delivery(self, make_app):
+        app = make_app(dedupe_window=0)
+        payload = dict(SIGNAL, signal_id='a')
+        
+        post_signals(app, payload, payload)
+        
+        assert app.state.executor.execute.call_count == 2
+    
+    def test_replay_expires_after_window(self, make_app):
+        app = make_app(dedupe_window=0.05)
+        payload = dict(SIGNAL, signal_id='a')
+        
+        post_signals(app, payload)
+        time.sleep(0.1)
+        post_signals(app, payload)
+        
+        assert app.state.executor.execute.call_count == 2
+    
+    def test_failure_with_order_id_is_replayed(self, make_app):
+        app = make_app()
+        app.state.executor.execute.side_effect = (
+            lambda signal: ExecutionResult.fail("Fill timeout", signal, "0000012345")
+        )
+        payload = dict(SIGNAL, signal_id='a')
+        
+        first, second = post_signals(app, payload, payload)
+        
+        assert first.status_code == second.status_code == 400
+        assert first.json() == second.json()
+        assert first.json()['detail']['order_id'] == "0000012345"
+        assert app.state.executor.execute.call_count == 1
+    
+    def test_failure_without_order_id_is_retried(self, make_app):
+        app = make_app()
+        app.state.executor.execute.side_effect = (
+            lambda signal: ExecutionResult.fail("Broker unavailable", signal)
+        )
+        payload = dict(SIGNAL, signal_id='a')
+        
+        first, second = post_signals(app, payload, payload)
+        
+        assert first.status_code == second.status_code == 400
+        assert first.json()['detail']['message'] == "Broker unavailable"
+        assert app.state.executor.execute.call_count == 2
+    
+    def test_duplicate_in_progress_gets_409(self, make_app):
+        app = make_app()
+        started = threading.Event()
+        release = threading.Event()
+        
+        def slow_execute(signal):
+            started.set()
+            release.wait(5)
+            return ExecutionResult.ok("0000012345", signal, filled=True)
+        
+        app.state.executor.execute.side_effect = slow_execute
+        payload = dict(SIGNAL, signal_id='a')
+        
+        async def scenario():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                first = asyncio.create_task(client.post("/webhook", json=payload))
+                await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+                second = await client.post("/webhook", json=payload)
+                release.set()
+                return await first, second
+        
+        first, second = asyncio.run(scenario())
+        
+        assert first.status_code == 200
+        assert second.status_code == 409
+        assert second.json()['detail']['message'] == "Duplicate signal in progress"
+        assert app.state.executor.execute.call_count == 1